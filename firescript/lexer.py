@@ -2,6 +2,8 @@ import logging
 import re
 
 class Token:
+    __slots__ = ("type", "value", "index", "parent")
+
     type: str
     value: str
     index: int
@@ -10,6 +12,7 @@ class Token:
         self.type = type
         self.value = value
         self.index = index
+        self.parent = None
 
     def __str__(self):
         return f"Token('{self.type}', '{self.value}', {self.index})"
@@ -98,6 +101,12 @@ class Lexer:
         "MULTI_LINE_COMMENT_END": r"\*\/",
     }
 
+    # compiled once, tokenize tries them at every position in the file
+    token_patterns: dict[str, re.Pattern] = {
+        token_type: re.compile(regex) for token_type, regex in (comments | keywords | seperators | operators | literals).items()
+    }
+    identifier_pattern: re.Pattern = re.compile(identifier)
+
     def __init__(self, file: str) -> None:
         self.file: str = file
         self.all_token_types = self.comments | self.keywords | self.seperators | self.operators | self.literals
@@ -112,8 +121,8 @@ class Lexer:
             token = Token()
             token.index = index
 
-            for token_type, regex in self.all_token_types.items():
-                match = re.match(regex, self.file[index:])
+            for token_type, pattern in self.token_patterns.items():
+                match = pattern.match(self.file, index)
                 if match:
                     token.type = token_type
                     token.value = match.group()
@@ -123,7 +132,7 @@ class Lexer:
             if token.type:
                 tokens.append(token)
             else:
-                match = re.match(self.identifier, self.file[index:])
+                match = self.identifier_pattern.match(self.file, index)
                 if match:
                     token.type = "IDENTIFIER"
                     token.value = match.group()
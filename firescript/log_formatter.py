@@ -51,8 +51,13 @@ class LogFormatter(logging.Formatter):
         logging.CRITICAL: prefix + Colors.LIGHT_PURPLE + msg + suffix + Colors.END,
     }
 
+    def __init__(self):
+        super().__init__()
+        # build the formatter for each level once instead of for every record
+        self.formatters = {level: logging.Formatter(log_fmt, '%H:%M:%S') for level, log_fmt in self.FORMATS.items()}
+        self.default_formatter = logging.Formatter(None, '%H:%M:%S')
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt, '%H:%M:%S')
+        formatter = self.formatters.get(record.levelno, self.default_formatter)
         return formatter.format(record)
     
\ No newline at end of file
@@ -37,10 +37,13 @@ if args.file:
     lexer = Lexer(file)
     tokens = lexer.tokenize()
 
-    # some python bs
-    newline = "\n"
-    logging.debug(f"tokens:\n{newline.join([str(token) for token in tokens])}")
+    if args.debug:
+        # some python bs
+        newline = "\n"
+        logging.debug(f"tokens:\n{newline.join([str(token) for token in tokens])}")
 
     parser = Parser(tokens, file, os.path.basename(args.file))
     ast = parser.parse()
-    logging.debug(f"ast:\n{ast}")
\ No newline at end of file
+
+    if args.debug:
+        logging.debug(f"ast:\n{ast}")
\ No newline at end of file
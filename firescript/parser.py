@@ -1,12 +1,14 @@
 import logging
 
 from lexer import Token, Lexer
-from utils.file_utils import get_line_and_coumn_from_index, get_line
+from utils.file_utils import get_line_and_column_from_index, get_line
 
 from typing import Union
 
 
 class ASTNode:
+    __slots__ = ("children", "parent")
+
     children: list[Union["ASTNode", Token]]
     parent: "ASTNode"
 
@@ -56,6 +58,8 @@ class ASTNode:
         self.children = None
 
 class MethodNode(ASTNode):
+    __slots__ = ("name", "args", "return_type", "nullable")
+
     def __init__(self, parent: ASTNode, name: str, args: list[tuple[str, str, str]], return_type: str, nullable: bool = False, children: list[Union["ASTNode", Token]] = []):
         super().__init__(parent)
         self.name = name
@@ -99,6 +103,24 @@ class Parser:
         "input",
     ]
 
+    type_token_types: frozenset[str] = frozenset(Lexer.types)
+
+    # opening token type -> error for an opener that is never closed
+    opening_tokens: dict[str, str] = {
+        "OPEN_BRACE": "Unclosed brace",
+        "OPEN_BRACKET": "Unclosed bracket",
+        "OPEN_PAREN": "Unclosed parenthesis",
+        "MULTI_LINE_COMMENT_START": "Unclosed multiline comment",
+    }
+
+    # closing token type -> (matching opening token type, error for an unmatched closer)
+    closing_tokens: dict[str, tuple[str, str]] = {
+        "CLOSE_BRACE": ("OPEN_BRACE", "Unexpected closing brace"),
+        "CLOSE_BRACKET": ("OPEN_BRACKET", "Unexpected closing bracket"),
+        "CLOSE_PAREN": ("OPEN_PAREN", "Unexpected closing parenthesis"),
+        "MULTI_LINE_COMMENT_END": ("MULTI_LINE_COMMENT_START", "Unexpected multiline comment terminator"),
+    }
+
     def __init__(self, tokens: list[Token], file: str = None, filename: str = None):
         self.tokens: list[Token] = tokens
 
@@ -114,7 +136,7 @@ class Parser:
             logging.error(text)
             return
 
-        line_num, column_num = get_line_and_coumn_from_index(
+        line_num, column_num = get_line_and_column_from_index(
             self.file, token.index)
         line_text = get_line(self.file, line_num)
         logging.error(text + f"\n> {line_text.strip()}\n" + " " * (
@@ -128,56 +150,36 @@ class Parser:
 
         # Make sure all braces, brackets, parentheses and comments are closed
 
-        open_braces: list[Token] = []
-        open_brackets: list[Token] = []
-        open_parentheses: list[Token] = []
-        open_comments: list[Token] = []
+        open_tokens: dict[str, list[Token]] = {token_type: [] for token_type in self.opening_tokens}
 
         for token in self.tokens:
-            if token.type == "OPEN_BRACE":
-                open_braces.append(token)
-            elif token.type == "CLOSE_BRACE":
-                if len(open_braces) == 0:
-                    self.error("Unexpected closing brace", token)
-                else:
-                    open_braces.pop()
-            elif token.type == "OPEN_BRACKET":
-                open_brackets.append(token)
-            elif token.type == "CLOSE_BRACKET":
-                if len(open_brackets) == 0:
-                    self.error("Unexpected closing bracket", token)
-                else:
-                    open_brackets.pop()
-            elif token.type == "OPEN_PAREN":
-                open_parentheses.append(token)
-            elif token.type == "CLOSE_PAREN":
-                if len(open_parentheses) == 0:
-                    self.error("Unexpected closing parenthesis", token)
-                else:
-                    open_parentheses.pop()
-            elif token.type == "MULTI_LINE_COMMENT_START":
-                open_comments.append(token)
-            elif token.type == "MULTI_LINE_COMMENT_END":
-                if len(open_comments) == 0:
-                    self.error("Unexpected multiline comment terminator", token)
+            opened = open_tokens.get(token.type)
+            if opened is not None:
+                opened.append(token)
+                continue
+
+            closing = self.closing_tokens.get(token.type)
+            if closing is not None:
+                opening_type, error = closing
+                opened = open_tokens[opening_type]
+                if len(opened) == 0:
+                    self.error(error, token)
                 else:
-                    open_comments.pop()
+                    opened.pop()
 
-        if len(open_braces) > 0:
-            self.error("Unclosed brace", open_braces[0])
-        if len(open_brackets) > 0:
-            self.error("Unclosed bracket", open_brackets[0])
-        if len(open_parentheses) > 0:
-            self.error("Unclosed parenthesis", open_parentheses[0])
-        if len(open_comments) > 0:
-            self.error("Unclosed multiline comment", open_comments[0])
+        for token_type, error in self.opening_tokens.items():
+            if len(open_tokens[token_type]) > 0:
+                self.error(error, open_tokens[token_type][0])
 
         self.working_node: ASTNode = self.ast
         current_scope = self.ast
         scope_stack: list[ASTNode] = []  # Stack to keep track of scopes
 
-        while index < len(self.tokens):
-            token = self.tokens[index]
+        tokens = self.tokens
+        token_count = len(tokens)
+
+        while index < token_count:
+            token = tokens[index]
 
             if token.type == "OPEN_BRACE":
                 # Create a new scope
@@ -194,35 +196,56 @@ class Parser:
                 current_scope = scope_stack.pop().parent
                 index += 1
             else:
-                # Add token to the current scope
-                current_scope.add_child(token)
-                index += 1
+                # Add the whole run of tokens up to the next brace to the current scope at once,
+                # add_child would rescan the scope's children for every token
+                run_end = index + 1
+                while run_end < token_count and tokens[run_end].type not in ("OPEN_BRACE", "CLOSE_BRACE"):
+                    run_end += 1
+
+                run = tokens[index:run_end]
+                for run_token in run:
+                    run_token.parent = current_scope
+
+                current_scope.children.extend(run)
+                index = run_end
 
         # Remove empty scopes
-        def remove_empty_scopes(scope: ASTNode):
-            for child in list(scope.children):  # Create a copy of children list for iteration
-                if isinstance(child, ASTNode):
-                    remove_empty_scopes(child)
-                    if len(child.children) == 0:
-                        child.self_destruct()
+        # Collect scopes parents first, then walk them backwards so a scope that only held
+        # empty scopes is itself removed, without recursing once per nesting level
+        scopes: list[ASTNode] = []
+        pending: list[ASTNode] = [self.ast]
 
-        remove_empty_scopes(self.ast)
+        while pending:
+            scope = pending.pop()
+            scopes.append(scope)
+            pending.extend(child for child in scope.children if isinstance(child, ASTNode))
+
+        for scope in reversed(scopes[1:]):  # never remove the root
+            if len(scope.children) == 0:
+                scope.self_destruct()
 
         # Parse method declarations
 
-        def parse_method_declaration(scope: ASTNode):
+        def parse_method_declaration(scope: ASTNode) -> list[ASTNode]:
+            """
+            :param scope: The scope to parse method declarations in
+            :return: The scopes nested in it, which still have to be parsed"""
+
+            children = scope.children
+            child_count = len(children)
+            nested_scopes: list[ASTNode] = []
             method_start = -1
 
-            for i, child in enumerate(scope.children):
+            for i, child in enumerate(children):
                 if isinstance(child, ASTNode):
-                    parse_method_declaration(child)
+                    nested_scopes.append(child)
                 elif isinstance(child, Token):
-                    if len(scope.children) > 3:
-                        if scope.children[i].type in list(Lexer.types.keys()):
-                            if scope.children[i+1].type == "IDENTIFIER":
-                                if scope.children[i+2].type == "OPEN_PAREN":
-                                    if i > 0 and type(scope.children[i-1]) == ASTNode:
-                                        if scope.children[i-1].type == "NULLABLE":
+                    if child_count > 3:
+                        if child.type in self.type_token_types:
+                            if children[i+1].type == "IDENTIFIER":
+                                if children[i+2].type == "OPEN_PAREN":
+                                    if i > 0 and type(children[i-1]) == ASTNode:
+                                        if children[i-1].type == "NULLABLE":
                                             method_start = i-1
                                         else:
                                             method_start = i
@@ -232,7 +255,7 @@ class Parser:
                                     logging.debug(f"Found method start at index {method_start}")
 
                     # Parse method end
-                    if scope.children[i].type == "CLOSE_PAREN":
+                    if child.type == "CLOSE_PAREN":
                         if method_start != -1:
                             method_end = i
                             
@@ -240,13 +263,13 @@ class Parser:
                             return_type = ""
                             method_name = ""
                             
-                            if scope.children[method_start].type == "NULLABLE":
+                            if children[method_start].type == "NULLABLE":
                                 nullable = True
                                 method_start += 1
 
-                            return_type = scope.children[method_start].type
+                            return_type = children[method_start].type
 
-                            method_name = scope.children[method_start+1].value
+                            method_name = children[method_start+1].value
 
                             # Parse arguments
 
@@ -257,30 +280,38 @@ class Parser:
 
                             while arg_start < method_end:
                                 arg_nullable = False
-                                if scope.children[arg_start].type == "NULLABLE":
+                                if children[arg_start].type == "NULLABLE":
                                     arg_nullable = True
                                     arg_start += 1
 
-                                arg_type = scope.children[arg_start].type
-                                arg_name = scope.children[arg_start+1].value
+                                arg_type = children[arg_start].type
+                                arg_name = children[arg_start+1].value
 
                                 args.append((arg_nullable, arg_type, arg_name))
 
                                 arg_start += 3
 
-                            logging.debug(nullable)
-                            method_signature = f"{"NULLABLE" if nullable else ""} {return_type} {method_name}"
-                            method_signature += f"({', '.join([f'{"NULLABLE" if arg_nullable else ""} {arg_type} {arg_name}' for arg_nullable, arg_type, arg_name in args])})"
+                            # only build the signature when it will actually be logged
+                            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                                logging.debug(nullable)
+                                method_signature = f"{"NULLABLE" if nullable else ""} {return_type} {method_name}"
+                                method_signature += f"({', '.join([f'{"NULLABLE" if arg_nullable else ""} {arg_type} {arg_name}' for arg_nullable, arg_type, arg_name in args])})"
 
-                            logging.debug(f"Found method declaration: {method_signature}")
+                                logging.debug(f"Found method declaration: {method_signature}")
 
-                            method_node = MethodNode(scope, method_name, args, return_type, nullable, scope.children[method_end + 1].children)
+                            method_node = MethodNode(scope, method_name, args, return_type, nullable, children[method_end + 1].children)
 
-                            scope.children[method_end + 1] = method_node
+                            children[method_end + 1] = method_node
 
                             method_start = -1
 
-        parse_method_declaration(self.ast)
+            return nested_scopes
+
+        # Work through nested scopes with a stack rather than recursing once per nesting level
+        pending_scopes: list[ASTNode] = [self.ast]
+
+        while pending_scopes:
+            pending_scopes.extend(parse_method_declaration(pending_scopes.pop()))
 
         if self.error_count > 0:
             logging.error(f"Found {self.error_count} errors while parsing {self.filename}")
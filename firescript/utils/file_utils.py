@@ -1,18 +1,36 @@
-def get_line_and_coumn_from_index(file: str, index: int) -> tuple[int, int]:
-    line = 1
-    column = 0
+import re
+from bisect import bisect_right
+from functools import lru_cache
 
-    for i, char in enumerate(file):
-        if i == index:
-            break
+class LineIndex:
+    """ Line start offsets of a source file, built once and shared by the lookups below """
+    __slots__ = ("file", "line_starts")
 
-        if char == "\n":
-            line += 1
-            column = 0
-        else:
-            column += 1
+    def __init__(self, file: str):
+        self.file: str = file
+        self.line_starts: list[int] = [0]
+        self.line_starts.extend(match.end() for match in re.finditer("\n", file))
 
-    return line, column
+    def get_line_and_column(self, index: int) -> tuple[int, int]:
+        line = bisect_right(self.line_starts, index)
+
+        return line, index - self.line_starts[line - 1]
+
+    def get_line(self, line: int) -> str:
+        start = self.line_starts[line - 1]
+        end = self.line_starts[line] - 1 if line < len(self.line_starts) else len(self.file)
+
+        return self.file[start:end].rstrip("\r")
+
+@lru_cache(maxsize=8)
+def get_line_index(file: str) -> LineIndex:
+    return LineIndex(file)
+
+def get_line_and_column_from_index(file: str, index: int) -> tuple[int, int]:
+    return get_line_index(file).get_line_and_column(index)
+
+# old, misspelled name
+get_line_and_coumn_from_index = get_line_and_column_from_index
 
 def get_line(file: str, line: int) -> str:
-    return file.splitlines()[line - 1]
+    return get_line_index(file).get_line(line)